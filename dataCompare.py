@@ -1,9 +1,31 @@
 import os
 import re
+import mmap
+import sys
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from tqdm import tqdm
 import argparse
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
 BANNER = """
 -------------------------------------------------------------------------------
                       Data Compare for Check The Same Key 
@@ -24,81 +46,347 @@ REGEX_PATTERNS = {
     "url": r"^(https?|ftp)://[^\s/$.?#].[^\s]*$"
 }
 
+# Patterns compiled once at import so extraction does not recompile per file
+COMPILED_PATTERNS = {key: re.compile(pattern) for key, pattern in REGEX_PATTERNS.items()}
+
+# Every character str.strip() removes except the newline, UTF-8 encoded
+_BYTES_PADDING = b"(?:" + b"|".join(
+    re.escape(char.encode())
+    for char in "\t\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004"
+    "\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+) + b")*"
+
+# Byte-level stand-ins for patterns whose str form does not translate to
+# bytes: "." in the URL pattern matches one character, which can be several
+# UTF-8 bytes, so URLs are only prefiltered by scheme here
+_BYTES_PATTERN_BODIES = {
+    "url": r"(?:https?|ftp)://[^\n]+",
+}
+
+# Line-oriented byte patterns for scanning memory-mapped TXT files; the
+# surrounding whitespace is consumed so group 1 is roughly the stripped value
+COMPILED_BYTES_PATTERNS = {
+    key: re.compile(
+        rb"(?m)^" + _BYTES_PADDING
+        + rb"(" + _BYTES_PATTERN_BODIES.get(key, pattern[1:-1]).encode() + rb")"
+        + _BYTES_PADDING + rb"$"
+    )
+    for key, pattern in REGEX_PATTERNS.items()
+}
+
+def _read_csv(file_path):
+    """
+    Read a CSV file with PyArrow's multi-threaded parser as text columns,
+    falling back to pandas when PyArrow is unavailable or rejects the file
+    (for example rows with fewer fields than the header).
+    """
+    if pacsv is None or not hasattr(pd, "ArrowDtype"):
+        return pd.read_csv(file_path)
+    try:
+        # Header names come from pandas so duplicates and blanks are renamed
+        # exactly as the pandas path does (a, a.1, Unnamed: 1, ...); every
+        # column is read as text so values are written back unchanged
+        header = [str(name) for name in pd.read_csv(file_path, nrows=0).columns]
+        read_options = pacsv.ReadOptions(column_names=header, skip_rows=1)
+        convert_options = pacsv.ConvertOptions(column_types={name: pa.string() for name in header})
+        table = pacsv.read_csv(file_path, read_options=read_options, convert_options=convert_options)
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    except Exception:
+        return pd.read_csv(file_path)
+
+def _read_excel(file_path):
+    """
+    Read an Excel workbook with the Rust-backed calamine engine when available,
+    retrying with the default engine if it fails (pandas before 2.2 does not
+    know the calamine engine).
+    """
+    if python_calamine is None:
+        return pd.read_excel(file_path)
+    try:
+        return pd.read_excel(file_path, engine="calamine")
+    except Exception:
+        return pd.read_excel(file_path)
+
+def _read_txt(file_path):
+    """
+    Read a TXT file into a single "Data" column, one row per line, without
+    the line terminators.
+    """
+    with open(file_path, 'r') as file:
+        lines = [line.rstrip("\n") for line in file]
+        return pd.DataFrame(lines, columns=["Data"])
+
+def _read_json(file_path):
+    """
+    Read a JSON Lines file.
+    """
+    return pd.read_json(file_path, lines=True)
+
+# Loader per lowercased file extension
+_LOADERS = {
+    ".csv": _read_csv,
+    ".xls": _read_excel,
+    ".xlsx": _read_excel,
+    ".txt": _read_txt,
+    ".json": _read_json,
+}
+
 def load_data(file_path):
     """
     Load data from CSV, XLSX, TXT, or JSON files.
     """
-    _, file_extension = os.path.splitext(file_path)
+    file_extension = os.path.splitext(file_path)[1].lower()
     try:
-        if file_extension.lower() == ".csv":
-            return pd.read_csv(file_path)
-        elif file_extension.lower() in [".xls", ".xlsx"]:
-            return pd.read_excel(file_path)
-        elif file_extension.lower() == ".txt":
-            with open(file_path, 'r') as file:
-                lines = file.readlines()
-                return pd.DataFrame(lines, columns=["Data"])
-        elif file_extension.lower() == ".json":
-            return pd.read_json(file_path, lines=True)
-        else:
+        loader = _LOADERS.get(file_extension)
+        if loader is None:
             raise ValueError(f"Unsupported file type: {file_extension}")
+        return loader(file_path)
     except Exception as e:
         print(f"[ERROR] Could not load file {file_path}: {e}")
         return pd.DataFrame()
 
+def _validate_ip(value):
+    """
+    Validate a dotted-quad IPv4 address octet by octet instead of regex.
+    Zero-padded octets such as 192.168.001.008 are accepted, as decimal.
+    """
+    parts = value.split(".")
+    if len(parts) != 4:
+        return False
+    for part in parts:
+        if not (1 <= len(part) <= 3 and part.isascii() and part.isdigit()) or int(part) > 255:
+            return False
+    return True
+
+# Cheap length and first-character bounds per key, checked before any regex:
+# (min length, max length or None, allowed first characters)
+PREFILTERS = {
+    "ip": (7, 15, "0123456789"),
+    "domain": (4, 253, "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-"),
+    "url": (8, None, "fh"),
+}
+
+def _prefilter(values, key):
+    """
+    Return a mask of values that could possibly be valid for the key, using
+    only length and first-character checks.
+    """
+    min_length, max_length, first_chars = PREFILTERS[key]
+    lengths = values.str.len()
+    if max_length is None:
+        mask = lengths >= min_length
+    else:
+        mask = lengths.between(min_length, max_length)
+    mask &= values.str[0].isin(set(first_chars))
+    if key == "domain":
+        mask &= values.str.contains(".", regex=False)
+    return mask.fillna(False).astype(bool)
+
+def _passes_prefilter(value, key):
+    """
+    Scalar form of _prefilter for a single stripped value.
+    """
+    min_length, max_length, first_chars = PREFILTERS[key]
+    if len(value) < min_length or (max_length is not None and len(value) > max_length):
+        return False
+    if value[0] not in first_chars:
+        return False
+    return key != "domain" or "." in value
+
+def _as_str(series):
+    """
+    Return the series as strings, skipping the copy when it already has a
+    pandas string dtype. Object columns may hold non-string values, and
+    Arrow-backed columns do not accept compiled patterns, so both are converted.
+    """
+    if isinstance(series.dtype, pd.StringDtype):
+        return series
+    return series.astype(str)
+
 def extract_valid_data(dataframe, key):
     """
     Extract valid data from a dataframe using regex based on the key.
+    Values are stripped first so the anchored patterns can be matched whole,
+    and values that fail the cheap prefilter never reach the regex.
     """
     if key.lower() not in REGEX_PATTERNS:
         raise ValueError(f"Unsupported key: {key}")
 
-    regex = REGEX_PATTERNS[key.lower()]
-    valid_data = pd.Series(dtype="object")
+    columns = [_as_str(dataframe[column]) for column in dataframe.columns]
+    if len(columns) == 1:
+        values = columns[0].str.strip()
+    else:
+        values = pd.concat(columns, ignore_index=True).str.strip()
+    values = values[_prefilter(values, key.lower())]
+    if key.lower() == "ip":
+        mask = values.map(_validate_ip).astype(bool)
+    else:
+        mask = values.str.fullmatch(COMPILED_PATTERNS[key.lower()])
+    valid_data = values[mask].drop_duplicates()
+
+    return valid_data.reset_index(drop=True)
 
-    for column in dataframe.columns:
-        extracted = dataframe[column].astype(str).str.extract(f"({regex})")[0]
-        valid_data = pd.concat([valid_data, extracted], axis=0)
+def _is_valid_value(value, key):
+    """
+    Validate a single stripped value against the key, applying the same
+    prefilter as extract_valid_data so every path agrees on what is valid.
+    """
+    if not _passes_prefilter(value, key):
+        return False
+    if key == "ip":
+        return _validate_ip(value)
+    return COMPILED_PATTERNS[key].fullmatch(value) is not None
 
-    valid_data = valid_data.dropna().str.strip().drop_duplicates()
+# CSV files larger than this are read in row chunks so peak memory is
+# bounded by the chunk size instead of the file size
+CSV_CHUNK_THRESHOLD = 256 * 1024 * 1024
+CSV_CHUNKSIZE = 1_000_000
 
-    return valid_data.reset_index(drop=True)
+def iter_valid_csv(file_path, key, chunksize=CSV_CHUNKSIZE):
+    """
+    Yield valid values from a CSV file, reading it in chunks of rows.
+    """
+    try:
+        for chunk in pd.read_csv(file_path, dtype=str, chunksize=chunksize):
+            yield from extract_valid_data(chunk, key)
+    except Exception as e:
+        print(f"[ERROR] Could not load file {file_path}: {e}")
+
+def iter_valid_polars(file_path, key):
+    """
+    Yield valid values from a CSV file with a single lazy Polars query that
+    reads every column as text, strips, regex-filters and deduplicates.
+    Survivors are rechecked so results match the Python validators exactly.
+    If the query fails (for example on a Polars release without unpivot or
+    the streaming engine), the file is read through load_data instead.
+    """
+    try:
+        candidates = (
+            pl.scan_csv(file_path, infer_schema_length=0)
+            .unpivot(value_name="Data")
+            .select(pl.col("Data").str.strip_chars())
+            .filter(pl.col("Data").str.contains(REGEX_PATTERNS[key]))
+            .unique()
+            .collect(engine="streaming")
+        )
+    except Exception:
+        data = load_data(file_path)
+        if not data.empty:
+            yield from extract_valid_data(data, key)
+        return
+    for value in candidates["Data"]:
+        if _is_valid_value(value, key):
+            yield value
+
+def iter_valid(file_path, key):
+    """
+    Yield valid values from a file. TXT files are memory-mapped and scanned
+    with a byte-level regex without building a dataframe, CSV files go through
+    Polars when installed or are read in chunks when large; other formats go
+    through load_data.
+    """
+    key = key.lower()
+    if key not in REGEX_PATTERNS:
+        raise ValueError(f"Unsupported key: {key}")
+
+    _, file_extension = os.path.splitext(file_path)
+    if file_extension.lower() == ".csv" and pl is not None:
+        yield from iter_valid_polars(file_path, key)
+        return
+    if file_extension.lower() == ".csv" and os.path.getsize(file_path) > CSV_CHUNK_THRESHOLD:
+        yield from iter_valid_csv(file_path, key)
+        return
+    if file_extension.lower() != ".txt":
+        data = load_data(file_path)
+        if not data.empty:
+            yield from extract_valid_data(data, key)
+        return
 
-def extract_values_from_target(folder_path, key):
+    try:
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for match in COMPILED_BYTES_PATTERNS[key].finditer(mapped):
+                    # The byte pattern is a prefilter: strip and recheck the
+                    # decoded value so results match extract_valid_data
+                    value = match.group(1).decode().strip()
+                    if _is_valid_value(value, key):
+                        yield value
+    except Exception as e:
+        print(f"[ERROR] Could not load file {file_path}: {e}")
+
+def _process_file(args):
+    """
+    Collect the valid values of one target file. Runs in a worker process.
+    """
+    file_path, key = args
+    return set(iter_valid(file_path, key))
+
+# Maximum number of target files queued to the process pool at once
+MAX_IN_FLIGHT = 2 * (os.cpu_count() or 1)
+
+def extract_values_from_target(folder_path, key, origin_values=None):
     """
     Extract all valid values (IP, domain, or URL) from files in the target folder.
+    When origin_values is given, only values present in the origin are kept and
+    scanning stops as soon as every origin value has been found.
     """
-    folder_files = [f for f in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, f))]
+    with os.scandir(folder_path) as entries:
+        folder_files = [entry.path for entry in entries if entry.is_file()]
     target_values = set()
+    pending = None if origin_values is None else set(origin_values)
 
     print(f"[INFO] Extracting {key.upper()}s from target path...")
-    for file_name in tqdm(folder_files, desc="[PROCESSING FILES]", unit="file"):
-        file_path = os.path.join(folder_path, file_name)
-        target_data = load_data(file_path)
-        if not target_data.empty:
-            valid_target_data = extract_valid_data(target_data, key)
-            if not valid_target_data.empty:
-                target_values.update(valid_target_data.unique())
+    if pending is not None and not pending:
+        print(f"[INFO] No valid {key.upper()}s in origin, skipping target path.")
+        folder_files = []
+    # Only a bounded window of files is submitted at a time, so an early
+    # exit leaves at most that many calls to finish instead of the whole folder
+    files = iter(folder_files)
+    with ProcessPoolExecutor() as executor, tqdm(total=len(folder_files), desc="[PROCESSING FILES]", unit="file") as progress:
+        in_flight = deque(executor.submit(_process_file, (file_path, key)) for file_path in islice(files, MAX_IN_FLIGHT))
+        while in_flight:
+            values = in_flight.popleft().result()
+            progress.update()
+            if pending is not None:
+                values &= pending
+                pending -= values
+            target_values.update(map(sys.intern, values))
+            if pending is not None and not pending:
+                print(f"[INFO] All origin {key.upper()}s found, skipping remaining files.")
+                for remaining in in_flight:
+                    remaining.cancel()
+                break
+            for file_path in islice(files, 1):
+                in_flight.append(executor.submit(_process_file, (file_path, key)))
 
-    print(f"[INFO] Total unique {key.upper()}s in target path: {len(target_values)}")
-    return target_values
+    if pending is None:
+        print(f"[INFO] Total unique {key.upper()}s in target path: {len(target_values)}")
+    else:
+        print(f"[INFO] Total origin {key.upper()}s found in target path: {len(target_values)}")
+    return frozenset(target_values)
 
-def compare_with_origin(origin_file, target_values, key):
+def load_origin(origin_file):
     """
-    Compare target values (IP, domain, or URL) with origin file and find non-matching rows.
+    Load the origin file, raising ValueError when it cannot be loaded or is empty.
     """
     print("[INFO] Loading origin file...")
     origin_data = load_data(origin_file)
     if origin_data.empty:
         raise ValueError("[ERROR] Origin file could not be loaded or is empty.")
+    return origin_data
 
+def compare_with_origin(origin_data, target_values, key):
+    """
+    Compare target values (IP, domain, or URL) with origin data and find non-matching rows.
+    """
     print(f"[INFO] Comparing target {key.upper()}s with origin...")
-    origin_data["Match"] = origin_data.apply(
-        lambda row: any(str(val).strip() in target_values for val in row.astype(str)), axis=1
-    )
+    flat = origin_data.astype(str).apply(lambda column: column.str.strip())
+    mask = flat.isin(target_values).any(axis=1)
 
-    matching_rows = origin_data[origin_data["Match"]]
-    non_matching_rows = origin_data[~origin_data["Match"]].drop(columns=["Match"])
+    matching_rows = origin_data[mask]
+    non_matching_rows = origin_data[~mask]
 
     # Reporting
     print(f"[INFO] Total rows in origin: {len(origin_data)}")
@@ -120,9 +408,7 @@ def save_output(dataframe, output_path):
         elif file_extension in [".xls", ".xlsx"]:
             dataframe.to_excel(output_path, index=False)
         elif file_extension == ".txt":
-            with open(output_path, "w") as file:
-                for row in dataframe.itertuples(index=False):
-                    file.write("\t".join(map(str, row)) + "\n")
+            dataframe.to_csv(output_path, sep="\t", index=False, header=False)
         elif file_extension == ".json":
             dataframe.to_json(output_path, orient="records", lines=True)
         else:
@@ -148,8 +434,10 @@ def main():
         return
 
     try:
-        target_values = extract_values_from_target(args.path_target, args.key)
-        non_matching_rows, matching_rows = compare_with_origin(args.path_origin, target_values, args.key)
+        origin_data = load_origin(args.path_origin)
+        origin_values = extract_valid_data(origin_data, args.key)
+        target_values = extract_values_from_target(args.path_target, args.key, origin_values)
+        non_matching_rows, matching_rows = compare_with_origin(origin_data, target_values, args.key)
         if non_matching_rows.empty:
             print("[INFO] No non-matching data found. Output file will be empty.")
         else: